@@ -19,6 +19,26 @@ EMBEDDING_MODEL_NAME = "text-embedding-ada-002" # OpenAI embedding model
 # Or for local embeddings with Sentence Transformers:
 # EMBEDDING_MODEL_NAME_LOCAL = "all-MiniLM-L6-v2"
 LLM_MODEL_NAME = "gpt-3.5-turbo"
+LLM_FALLBACK_MODEL_NAME = os.getenv("LLM_FALLBACK_MODEL_NAME") # Secondary model used when the primary times out
+LLM_BASE_URL = os.getenv("LLM_BASE_URL") # Point at any OpenAI-compatible server, e.g. src/stub_llm_server.py
+
+# LLM Client (connection pooling, deadlines, retries, hedging)
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "16"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "8"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16")) # Upper bound on in-flight LLM requests
+LLM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("LLM_CONNECT_TIMEOUT_SECONDS", "5"))
+LLM_REQUEST_TIMEOUT_SECONDS = float(os.getenv("LLM_REQUEST_TIMEOUT_SECONDS", "20")) # Per HTTP attempt
+LLM_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "30")) # Per call, across retries and hedges
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+LLM_RETRY_BACKOFF_SECONDS = float(os.getenv("LLM_RETRY_BACKOFF_SECONDS", "0.5")) # Doubles per retry, full jitter
+LLM_RETRY_MAX_BACKOFF_SECONDS = float(os.getenv("LLM_RETRY_MAX_BACKOFF_SECONDS", "8"))
+LLM_FALLBACK_BUDGET_FRACTION = float(os.getenv("LLM_FALLBACK_BUDGET_FRACTION", "0.3")) # Share of the deadline kept for the fallback model
+LLM_HEDGING_ENABLED = os.getenv("LLM_HEDGING_ENABLED", "false").lower() in ("1", "true", "yes")
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95")) # Fire the duplicate after this observed latency
+LLM_HEDGE_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_DELAY_SECONDS", "2")) # Used until enough latencies are observed
+LLM_HEDGE_MAX_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_MAX_DELAY_SECONDS", "5")) # Cap on the observed-latency delay
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_WINDOW = int(os.getenv("LLM_HEDGE_WINDOW", "200"))
 
 # Data Processing
 CHUNK_SIZE = 1000
@@ -1,20 +1,231 @@
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import lru_cache
+
+import httpx
+import openai
 from langchain_openai import ChatOpenAI
 from langchain.prompts import ChatPromptTemplate, PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnablePassthrough
+from langchain_core.runnables import RunnableLambda, RunnablePassthrough
 
 from . import config
 
-def get_llm():
+# Transient upstream failures worth retrying (APITimeoutError is an APIConnectionError).
+RETRYABLE_ERRORS = (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
+
+
+class LLMDeadlineExceeded(TimeoutError):
     """
-    Initializes and returns the Language Model (LLM).
+    Raised when an LLM call does not finish within config.LLM_DEADLINE_SECONDS.
+    """
+
+
+class LLMWorkersBusy(RuntimeError):
     """
-    llm = ChatOpenAI(
-        model_name=config.LLM_MODEL_NAME,
+    Raised when no LLM worker frees up before the deadline. The upstream was never
+    called, so this is overload rather than a timeout and does not trigger the fallback.
+    """
+
+
+class _LatencyTracker:
+    """
+    Keeps a sliding window of first-request latencies (won or lost) to derive the hedge delay.
+    """
+    def __init__(self, window: int):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def hedge_delay(self) -> float:
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < config.LLM_HEDGE_MIN_SAMPLES:
+            delay = config.LLM_HEDGE_DELAY_SECONDS
+        else:
+            delay = samples[min(len(samples) - 1, int(config.LLM_HEDGE_PERCENTILE * len(samples)))]
+        return min(delay, config.LLM_HEDGE_MAX_DELAY_SECONDS)
+
+
+class _WorkerPool:
+    """
+    A fixed number of LLM workers. Callers wait (up to their deadline) for a free
+    worker instead of piling up in an unbounded executor queue.
+    """
+    def __init__(self, size: int):
+        self._executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="llm")
+        self._slots = threading.BoundedSemaphore(size)
+
+    def submit(self, fn, *args, timeout: float):
+        """
+        Runs fn on a free worker, or returns None if none frees up within `timeout` seconds.
+        """
+        if not self._slots.acquire(timeout=max(timeout, 0)):
+            return None
+        # Copy the context so callbacks/tracing of the calling chain follow the request into the worker thread.
+        context = contextvars.copy_context()
+        return self._executor.submit(context.run, self._run, fn, args)
+
+    def _run(self, fn, args):
+        try:
+            return fn(*args)
+        finally:
+            self._slots.release()
+
+
+@lru_cache(maxsize=None)
+def get_http_client() -> httpx.Client:
+    """
+    Returns the pooled HTTP client shared by every LLM instance in the process.
+    """
+    return httpx.Client(
+        limits=httpx.Limits(
+            max_connections=config.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=config.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+        timeout=httpx.Timeout(config.LLM_REQUEST_TIMEOUT_SECONDS, connect=config.LLM_CONNECT_TIMEOUT_SECONDS),
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_worker_pool() -> _WorkerPool:
+    # Bounds the number of in-flight LLM requests (including hedges) across the process.
+    return _WorkerPool(config.LLM_MAX_CONCURRENCY)
+
+
+def _deadline_exceeded() -> LLMDeadlineExceeded:
+    return LLMDeadlineExceeded(f"LLM call did not complete within {config.LLM_DEADLINE_SECONDS} seconds.")
+
+
+def _workers_busy() -> LLMWorkersBusy:
+    return LLMWorkersBusy(f"No LLM worker became free in time (LLM_MAX_CONCURRENCY={config.LLM_MAX_CONCURRENCY}).")
+
+
+def _request_timeout(seconds: float) -> httpx.Timeout:
+    # A plain float would override the connect timeout of the shared client as well.
+    return httpx.Timeout(seconds, connect=min(config.LLM_CONNECT_TIMEOUT_SECONDS, seconds))
+
+
+def _timed_invoke(chat_model, llm_input, deadline: float, kwargs: dict, record_latency=None):
+    start = time.monotonic()
+    # Never let a single HTTP attempt outlive the call's deadline.
+    timeout = min(config.LLM_REQUEST_TIMEOUT_SECONDS, deadline - start)
+    if timeout <= 0:
+        raise _deadline_exceeded()
+    try:
+        result = chat_model.invoke(llm_input, timeout=_request_timeout(timeout), **kwargs)
+    except openai.APITimeoutError:
+        # Still a (lower bound on the) slow latency the hedge percentile should see.
+        if record_latency:
+            record_latency(time.monotonic() - start)
+        raise
+    if record_latency:
+        record_latency(time.monotonic() - start)
+    return result
+
+
+def _invoke_hedged(chat_model, tracker: _LatencyTracker, llm_input, deadline: float,
+                   record_latency: bool, kwargs: dict):
+    """
+    Makes one attempt, firing a single duplicate request if hedging is enabled and
+    the first request is still outstanding after the hedge delay. First answer wins.
+    """
+    pool = _get_worker_pool()
+    # Record the first request's own latency whenever it finishes, even if a hedge beat it,
+    # so the window keeps the tail the percentile is meant to measure.
+    first = pool.submit(_timed_invoke, chat_model, llm_input, deadline, kwargs,
+                        tracker.record if record_latency else None,
+                        timeout=deadline - time.monotonic())
+    if first is None:
+        raise _workers_busy()
+    # A worker was free, so the request starts now; the hedge timer starts with it.
+    hedge_at = time.monotonic() + tracker.hedge_delay() if config.LLM_HEDGING_ENABLED else None
+    pending = {first}
+    while True:
+        now = time.monotonic()
+        if now >= deadline:
+            raise _deadline_exceeded()
+        timeout = deadline - now if hedge_at is None else max(0, min(deadline, hedge_at) - now)
+
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+        error = None
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+            error = future.exception()
+        if not pending:
+            raise error
+        if hedge_at is not None and time.monotonic() >= hedge_at:
+            hedge_at = None
+            # Only hedge into a free worker; under overload a duplicate would just add load.
+            hedge = pool.submit(_timed_invoke, chat_model, llm_input, deadline, kwargs, timeout=0)
+            if hedge is not None:
+                pending.add(hedge)
+
+
+def _invoke_with_retries(chat_model, tracker: _LatencyTracker, llm_input, deadline: float, kwargs: dict):
+    """
+    Retries transient failures with full-jitter exponential backoff, never past the deadline.
+    """
+    for attempt in range(config.LLM_MAX_RETRIES + 1):
+        try:
+            return _invoke_hedged(chat_model, tracker, llm_input, deadline, attempt == 0, kwargs)
+        except RETRYABLE_ERRORS as e:
+            if attempt == config.LLM_MAX_RETRIES:
+                raise
+            backoff = random.uniform(0, min(config.LLM_RETRY_MAX_BACKOFF_SECONDS,
+                                            config.LLM_RETRY_BACKOFF_SECONDS * 2 ** attempt))
+            if time.monotonic() + backoff >= deadline:
+                raise _deadline_exceeded() from e
+            time.sleep(backoff)
+
+
+def _build_chat_model(model_name: str) -> ChatOpenAI:
+    return ChatOpenAI(
+        model_name=model_name,
         temperature=0.7, # Adjust for creativity vs. factuality
-        openai_api_key=config.OPENAI_API_KEY
+        openai_api_key=config.OPENAI_API_KEY,
+        base_url=config.LLM_BASE_URL,
+        # No model-level timeout: _timed_invoke passes one per request, capped by the deadline.
+        max_retries=0, # Retries are handled by _invoke_with_retries, within the deadline
+        http_client=get_http_client(),
     )
-    return llm
+
+
+def get_llm():
+    """
+    Initializes and returns the Language Model (LLM).
+
+    Calls go through a shared connection pool with one deadline per call, bounded
+    retries and optional hedging. If config.LLM_FALLBACK_MODEL_NAME is set, the
+    fallback model answers whenever the primary one times out, using the time
+    left in the same deadline (at least LLM_FALLBACK_BUDGET_FRACTION of it).
+    LLMWorkersBusy is raised without trying the fallback when every worker is taken.
+    """
+    primary = _build_chat_model(config.LLM_MODEL_NAME)
+    primary_latencies = _LatencyTracker(config.LLM_HEDGE_WINDOW)
+    fallback = _build_chat_model(config.LLM_FALLBACK_MODEL_NAME) if config.LLM_FALLBACK_MODEL_NAME else None
+    fallback_latencies = _LatencyTracker(config.LLM_HEDGE_WINDOW)
+
+    def invoke(llm_input, **kwargs):
+        deadline = time.monotonic() + config.LLM_DEADLINE_SECONDS
+        if fallback is None:
+            return _invoke_with_retries(primary, primary_latencies, llm_input, deadline, kwargs)
+
+        primary_deadline = deadline - config.LLM_DEADLINE_SECONDS * config.LLM_FALLBACK_BUDGET_FRACTION
+        try:
+            return _invoke_with_retries(primary, primary_latencies, llm_input, primary_deadline, kwargs)
+        except (TimeoutError, openai.APITimeoutError):
+            return _invoke_with_retries(fallback, fallback_latencies, llm_input, deadline, kwargs)
+
+    return RunnableLambda(invoke, name=config.LLM_MODEL_NAME)
 
 def get_rag_prompt_template() -> ChatPromptTemplate:
     """
@@ -0,0 +1,112 @@
+import argparse
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubLLMServer(ThreadingHTTPServer):
+    """
+    A minimal OpenAI-compatible chat completions server with injectable latency.
+
+    Every request sleeps for `latency` seconds; with probability `tail_probability`
+    (drawn from an RNG seeded with `seed`) or on every `slow_every`-th request
+    starting with the first, it sleeps for `tail_latency` seconds instead,
+    simulating a slow upstream tail.
+    Point the app at it with LLM_BASE_URL=http://<host>:<port>/v1.
+    """
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8001, latency: float = 0.05,
+                 tail_latency: float = 0.0, tail_probability: float = 0.0, slow_every: int = 0,
+                 seed: int = None, answer: str = "Stub answer."):
+        super().__init__((host, port), _StubRequestHandler)
+        self.latency = latency
+        self.tail_latency = tail_latency
+        self.tail_probability = tail_probability
+        self.slow_every = slow_every
+        self._random = random.Random(seed)
+        self.answer = answer
+        self.request_count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def next_delay(self) -> float:
+        with self._lock:
+            self.request_count += 1
+            slow = self.slow_every > 0 and (self.request_count - 1) % self.slow_every == 0
+            slow = slow or self._random.random() < self.tail_probability
+        return self.tail_latency if slow else self.latency
+
+    def start_in_background(self) -> threading.Thread:
+        """
+        Serves requests from a daemon thread, e.g. for use inside a test or benchmark.
+        """
+        thread = threading.Thread(target=self.serve_forever, daemon=True)
+        thread.start()
+        return thread
+
+
+class _StubRequestHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        if self.path.rstrip("/") != "/v1/chat/completions":
+            self._send_json(404, {"error": {"message": f"Unknown path: {self.path}"}})
+            return
+
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        payload = json.loads(body or b"{}")
+        time.sleep(self.server.next_delay())
+
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": payload.get("model", "stub-model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": self.server.answer},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        })
+
+    def _send_json(self, status: int, payload: dict):
+        data = json.dumps(payload).encode("utf-8")
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            pass # The client gave up (deadline exceeded or a hedge won)
+
+    def log_message(self, format, *args):
+        pass # Keep benchmark output readable
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Stub OpenAI-compatible LLM server with injectable latency.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--latency", type=float, default=0.05, help="Normal response latency in seconds.")
+    parser.add_argument("--tail-latency", type=float, default=0.0, help="Latency of slow (tail) responses in seconds.")
+    parser.add_argument("--tail-probability", type=float, default=0.0, help="Fraction of responses that are slow.")
+    parser.add_argument("--slow-every", type=int, default=0, help="Make every Nth response slow, starting with the first (0 disables).")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for the tail-latency RNG.")
+    args = parser.parse_args()
+
+    server = StubLLMServer(args.host, args.port, args.latency, args.tail_latency, args.tail_probability,
+                           args.slow_every, args.seed)
+    print(f"Stub LLM server listening on {server.base_url} "
+          f"(latency={args.latency}s, tail={args.tail_latency}s @ p={args.tail_probability})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopping stub LLM server.")
@@ -0,0 +1,184 @@
+import os
+import time
+
+import openai
+import pytest
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key") # src.config refuses to load without one
+
+from src import config, llm_handler
+from src.llm_handler import LLMDeadlineExceeded, LLMWorkersBusy, ask_llm_directly, get_llm
+from src.stub_llm_server import StubLLMServer
+
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    """
+    Starts a StubLLMServer with the given latency settings and points the LLM client at it.
+    """
+    servers = []
+
+    def start(**kwargs):
+        server = StubLLMServer(port=0, **kwargs)
+        server.start_in_background()
+        servers.append(server)
+        monkeypatch.setattr(config, "LLM_BASE_URL", server.base_url)
+        return server
+
+    monkeypatch.setattr(config, "LLM_FALLBACK_MODEL_NAME", None)
+    monkeypatch.setattr(config, "LLM_HEDGING_ENABLED", False)
+    monkeypatch.setattr(config, "LLM_RETRY_BACKOFF_SECONDS", 0.01)
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def _p99(latencies):
+    latencies = sorted(latencies)
+    return latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))]
+
+
+def test_ask_llm_directly(stub_llm):
+    stub_llm(latency=0.01)
+    assert ask_llm_directly(get_llm(), "Question?") == "Stub answer."
+
+
+def test_deadline_bounds_call(stub_llm, monkeypatch):
+    stub_llm(latency=2.0)
+    monkeypatch.setattr(config, "LLM_DEADLINE_SECONDS", 0.5)
+
+    llm = get_llm()
+    start = time.monotonic()
+    with pytest.raises(LLMDeadlineExceeded):
+        llm.invoke("Question?")
+    assert time.monotonic() - start < config.LLM_DEADLINE_SECONDS + 0.5
+
+
+def test_no_requests_after_deadline(stub_llm, monkeypatch):
+    server = stub_llm(latency=2.0)
+    monkeypatch.setattr(config, "LLM_DEADLINE_SECONDS", 0.5)
+    monkeypatch.setattr(config, "LLM_RETRY_BACKOFF_SECONDS", 1.0)
+
+    with pytest.raises(LLMDeadlineExceeded):
+        get_llm().invoke("Question?")
+    time.sleep(1.0) # Abandoned attempts must not retry in the background
+    assert server.request_count == 1
+
+
+def test_retries_stop_after_max_attempts(stub_llm, monkeypatch):
+    server = stub_llm(latency=2.0)
+    monkeypatch.setattr(config, "LLM_REQUEST_TIMEOUT_SECONDS", 0.2)
+    monkeypatch.setattr(config, "LLM_DEADLINE_SECONDS", 10)
+    monkeypatch.setattr(config, "LLM_MAX_RETRIES", 2)
+
+    with pytest.raises(openai.APITimeoutError):
+        get_llm().invoke("Question?")
+    assert server.request_count == config.LLM_MAX_RETRIES + 1
+
+
+def test_fallback_answers_when_primary_times_out(stub_llm, monkeypatch):
+    stub_llm(latency=0.01, tail_latency=3.0, slow_every=100) # Only the first (primary) request is slow
+    monkeypatch.setattr(config, "LLM_FALLBACK_MODEL_NAME", "fallback-model")
+    monkeypatch.setattr(config, "LLM_DEADLINE_SECONDS", 2.0)
+    monkeypatch.setattr(config, "LLM_FALLBACK_BUDGET_FRACTION", 0.5)
+    monkeypatch.setattr(config, "LLM_MAX_RETRIES", 0)
+
+    llm = get_llm()
+    start = time.monotonic()
+    answer = llm.invoke("Question?")
+    assert answer.response_metadata["model_name"] == "fallback-model"
+    assert time.monotonic() - start < config.LLM_DEADLINE_SECONDS + 0.5
+
+
+def test_fallback_shares_the_call_deadline(stub_llm, monkeypatch):
+    stub_llm(latency=3.0)
+    monkeypatch.setattr(config, "LLM_FALLBACK_MODEL_NAME", "fallback-model")
+    monkeypatch.setattr(config, "LLM_DEADLINE_SECONDS", 1.0)
+
+    llm = get_llm()
+    start = time.monotonic()
+    with pytest.raises(LLMDeadlineExceeded):
+        llm.invoke("Question?")
+    assert time.monotonic() - start < config.LLM_DEADLINE_SECONDS + 0.5
+
+
+def test_hedging_reduces_p99(stub_llm, monkeypatch):
+    stub_llm(latency=0.02, tail_latency=1.5, slow_every=5)
+    monkeypatch.setattr(config, "LLM_HEDGE_DELAY_SECONDS", 0.1)
+    monkeypatch.setattr(config, "LLM_HEDGE_MIN_SAMPLES", 5)
+
+    def measure(hedging_enabled):
+        monkeypatch.setattr(config, "LLM_HEDGING_ENABLED", hedging_enabled)
+        llm = get_llm()
+        latencies = []
+        for _ in range(20):
+            start = time.monotonic()
+            llm.invoke("Question?")
+            latencies.append(time.monotonic() - start)
+        return _p99(latencies)
+
+    p99_without_hedging = measure(False)
+    p99_with_hedging = measure(True)
+    assert p99_without_hedging >= 1.5
+    assert p99_with_hedging < 1.0
+
+
+def test_no_hedge_without_free_worker(stub_llm, monkeypatch):
+    server = stub_llm(latency=0.5)
+    monkeypatch.setattr(config, "LLM_HEDGING_ENABLED", True)
+    monkeypatch.setattr(config, "LLM_HEDGE_DELAY_SECONDS", 0.05)
+    monkeypatch.setattr(config, "LLM_MAX_CONCURRENCY", 1)
+    llm_handler._get_worker_pool.cache_clear()
+    try:
+        get_llm().invoke("Question?")
+    finally:
+        llm_handler._get_worker_pool.cache_clear()
+    assert server.request_count == 1
+
+
+def test_hedge_delay_sees_slow_first_request(stub_llm, monkeypatch):
+    stub_llm(latency=0.01, tail_latency=0.5, slow_every=100) # Only the first request is slow
+    monkeypatch.setattr(config, "LLM_HEDGING_ENABLED", True)
+    monkeypatch.setattr(config, "LLM_HEDGE_DELAY_SECONDS", 0.05)
+    tracker = llm_handler._LatencyTracker(10)
+    chat_model = llm_handler._build_chat_model(config.LLM_MODEL_NAME)
+
+    llm_handler._invoke_hedged(chat_model, tracker, "Question?", time.monotonic() + 5, True, {})
+    time.sleep(1.0) # Let the losing first request finish
+    assert len(tracker._samples) == 1 # The winning hedge is not recorded
+    assert tracker._samples[0] >= 0.5
+
+
+def test_busy_workers_skip_fallback(stub_llm, monkeypatch):
+    server = stub_llm(latency=0.01)
+    monkeypatch.setattr(config, "LLM_FALLBACK_MODEL_NAME", "fallback-model")
+    monkeypatch.setattr(config, "LLM_DEADLINE_SECONDS", 0.5)
+    monkeypatch.setattr(config, "LLM_MAX_CONCURRENCY", 1)
+    llm_handler._get_worker_pool.cache_clear()
+    try:
+        pool = llm_handler._get_worker_pool()
+        pool.submit(time.sleep, 1.5, timeout=0) # Occupy the only worker
+        submits = []
+        submit = pool.submit
+        monkeypatch.setattr(pool, "submit", lambda *args, **kwargs: submits.append(args) or submit(*args, **kwargs))
+
+        with pytest.raises(LLMWorkersBusy):
+            get_llm().invoke("Question?")
+    finally:
+        llm_handler._get_worker_pool.cache_clear()
+    assert len(submits) == 1 # The fallback did not queue for a worker again
+    assert server.request_count == 0
+
+
+def test_connect_timeout_reaches_request(stub_llm, monkeypatch):
+    stub_llm(latency=0.01)
+    monkeypatch.setattr(config, "LLM_CONNECT_TIMEOUT_SECONDS", 1.5)
+    monkeypatch.setattr(config, "LLM_REQUEST_TIMEOUT_SECONDS", 20)
+    timeouts = []
+    client = llm_handler.get_http_client()
+    monkeypatch.setitem(client.event_hooks, "request", [lambda request: timeouts.append(request.extensions["timeout"])])
+
+    get_llm().invoke("Question?")
+    assert timeouts[0]["connect"] == 1.5
+    assert timeouts[0]["read"] <= 20